@@ -1,26 +1,41 @@
 import configparser
+import datetime
+import fnmatch
+import functools
 import os
 import re
 import sys
+import time
 
+# Modules only needed by the library API, bump list, --watch or --commit
+# (asyncio, concurrent.futures, ctypes, json, select, struct, subprocess) are
+# imported where they're used, so a plain ``bump`` run doesn't pay for them.
 import click
 import toml
-from first import first
 from packaging.utils import canonicalize_version
+from packaging.version import InvalidVersion, Version
 
-pattern = re.compile(r"((?:__)?version(?:__)? ?= ?[\"'])(.+?)([\"'])")
+# Both patterns only use bounded character classes (no lazy ``.+?`` and no
+# ``\s`` that can run across lines), so every match attempt stops at the next
+# quote or newline and scanning stays linear in the size of the input.
+pattern = re.compile(r"((?:__)?version(?:__)? ?= ?[\"'])([^\"'\n]+)([\"'])")
+toml_pattern = re.compile(
+    r"^([^\S\n]*version[^\S\n]*=[^\S\n]*[\"'])([^\"'\n]+)([\"'][^\S\n]*)$",
+    re.MULTILINE,
+)
 
 
 class Config:
-    def __init__(self):
+    def __init__(self, path="."):
         self.ini_config = configparser.RawConfigParser()
-        self.ini_config.read([".bump", "setup.cfg"])
+        self.ini_config.read(
+            [os.path.join(path, ".bump"), os.path.join(path, "setup.cfg")]
+        )
 
         self.toml_config = {}
-        if os.path.exists("pyproject.toml"):
-            self.toml_config = (
-                toml.load("pyproject.toml").get("tool", {}).get("bump", {})
-            )
+        pyproject = os.path.join(path, "pyproject.toml")
+        if os.path.exists(pyproject):
+            self.toml_config = toml.load(pyproject).get("tool", {}).get("bump", {})
 
     def get(self, key, coercer=str, default=None):
         candidate = self.toml_config.get(key)
@@ -106,15 +121,124 @@ class SemVer(object):
             self.patch += 1
 
 
+class CalVer(object):
+    """A ``YYYY.MM.N`` calendar version, where ``N`` counts the releases made
+    within a month.
+
+    Bumping moves the version to the current month, or increments ``N`` if it
+    is already there. The major, minor, patch and reset flags all mean the
+    same thing, since the year and month are always taken from the calendar.
+
+    The month is written without zero-padding; use ``ZeroPaddedCalVer`` for
+    ``YYYY.0M.N`` versions.
+    """
+
+    zero_pad = False
+
+    def __init__(self, year, month, micro=0, pre=None, local=None):
+        self.year = year
+        self.month = month
+        self.micro = micro
+        self.pre = pre
+        self.local = local
+
+    def __str__(self):
+        month = "{:02d}" if self.zero_pad else "{}"
+        version_string = ("{}." + month + ".{}").format(
+            self.year, self.month, self.micro
+        )
+        if self.pre:
+            version_string += "-" + self.pre
+        if self.local:
+            version_string += "+" + self.local
+        return version_string
+
+    @classmethod
+    def parse(cls, version):
+        local = pre = None
+        local_split = version.split("+")
+        if len(local_split) > 1:
+            version, local = local_split
+        pre_split = version.split("-", 1)
+        if len(pre_split) > 1:
+            version, pre = pre_split
+        year, month, *micro = version.split(".")
+        if len(micro) > 1:
+            raise ValueError("invalid calendar version: {}".format(version))
+        return cls(
+            year=int(year),
+            month=int(month),
+            micro=int(micro[0]) if micro else 0,
+            pre=pre,
+            local=local,
+        )
+
+    def bump(
+        self,
+        major=False,
+        minor=False,
+        patch=False,
+        pre=None,
+        local=None,
+        reset=False,
+        today=None,
+    ):
+        if pre:
+            self.pre = pre
+        if local:
+            self.local = local
+        if major or minor or patch or not (pre or local):
+            today = today or datetime.date.today()
+            # Never move a version dated in the future back to today
+            if (self.year, self.month) >= (today.year, today.month):
+                self.micro += 1
+            else:
+                self.year, self.month, self.micro = today.year, today.month, 0
+
+
+class ZeroPaddedCalVer(CalVer):
+    """A ``YYYY.0M.N`` calendar version, with the month always zero-padded."""
+
+    zero_pad = True
+
+
+# Built-in version schemes, other schemes are registered under the
+# "bump.schemes" entry point group
+SCHEMES = {"semver": SemVer, "calver": CalVer, "calver-padded": ZeroPaddedCalVer}
+
+
+def get_scheme(name):
+    """Return the version scheme class registered as ``name``.
+
+    A scheme is a class with a ``parse(version_string)`` classmethod, whose
+    instances have a ``bump(major, minor, patch, pre, local, reset)`` method
+    and turn back into a version string with ``str()``.
+    """
+    if name in SCHEMES:
+        return SCHEMES[name]
+
+    # Only look at (and import) installed plugins when one is asked for, so
+    # projects using a built-in scheme don't pay for it at startup.
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group="bump.schemes", name=name):
+        return entry_point.load()
+    raise ValueError(f"unknown version scheme: {name}")
+
+
 class NoVersionFound(Exception):
     pass
 
 
 def find_version(input_string):
-    match = first(pattern.findall(input_string))
+    # Cheap literal prefilter before running the regex over the whole input.
+    if "version" not in input_string:
+        raise NoVersionFound
+    # search() stops at the first match instead of collecting all of them
+    match = pattern.search(input_string)
     if match is None:
         raise NoVersionFound
-    return match[1]
+    return match.group(2)
 
 
 def find_version_in_toml(filepath="pyproject.toml"):
@@ -131,42 +255,844 @@ def find_version_in_toml(filepath="pyproject.toml"):
         raise NoVersionFound
 
 
+def _replace_version(regex, contents, new_version, count=0):
+    """Replace the version group of up to ``count`` (or all) matches of
+    ``regex`` in ``contents``.
+
+    Returns the new contents along with the ``(start, end)`` spans of the
+    replaced versions in the original contents.
+    """
+    pieces = []
+    spans = []
+    position = 0
+    for match in regex.finditer(contents):
+        start, end = match.span(2)
+        pieces += [contents[position:start], new_version]
+        spans.append((start, end))
+        position = end
+        if len(spans) == count:
+            break
+    pieces.append(contents[position:])
+    return "".join(pieces), spans
+
+
+def _diff_version(filename, contents, spans, new_version, context=3):
+    """Build a unified diff for replacing each of ``spans`` in ``contents``
+    with ``new_version``.
+
+    Rather than diffing the whole file, only the lines around each span are
+    looked at, so apart from counting newlines up to the last span, the cost
+    is proportional to the size of the change.
+    """
+    # Changed line number -> [line start, line end, spans on that line]
+    changed = {}
+    lineno = 1
+    position = 0
+    for start, end in spans:
+        lineno += contents.count("\n", position, start)
+        position = start
+        if lineno not in changed:
+            line_start = contents.rfind("\n", 0, start) + 1
+            line_end = contents.find("\n", end)
+            if line_end == -1:
+                line_end = len(contents)
+            changed[lineno] = [line_start, line_end, []]
+        changed[lineno][2].append((start, end))
+
+    # Group changed lines whose context overlaps into hunks
+    hunks = []
+    for lineno in changed:
+        if hunks and lineno - hunks[-1][-1] - 1 <= 2 * context:
+            hunks[-1].append(lineno)
+        else:
+            hunks.append([lineno])
+
+    diff = ["--- a/{}".format(filename), "+++ b/{}".format(filename)]
+    for hunk in hunks:
+        first, last = hunk[0], hunk[-1]
+        start = changed[first][0]
+        before = 0
+        while before < context and start > 0:
+            start = contents.rfind("\n", 0, start - 1) + 1
+            before += 1
+        end = changed[last][1]
+        after = 0
+        while after < context and end < len(contents) - 1:
+            end = contents.find("\n", end + 1)
+            if end == -1:
+                end = len(contents)
+            after += 1
+
+        lines = contents[start:end].split("\n")
+        if end == len(contents):
+            # The hunk reaches a last line that has no trailing newline
+            lines[-1] += "\n\\ No newline at end of file"
+        diff.append("@@ -{0},{1} +{0},{1} @@".format(first - before, len(lines)))
+        removed, added = [], []
+        for lineno, line in enumerate(lines, first - before):
+            if lineno not in changed:
+                diff += removed + added + [" " + line]
+                removed, added = [], []
+                continue
+            line_start, _, line_spans = changed[lineno]
+            new_line = []
+            position = 0
+            for span_start, span_end in line_spans:
+                new_line += [line[position : span_start - line_start], new_version]
+                position = span_end - line_start
+            new_line.append(line[position:])
+            removed.append("-" + line)
+            added.append("+" + "".join(new_line))
+        diff += removed + added
+    return "\n".join(diff) + "\n"
+
+
+def _read_toml_replacement(new_version, filepath):
+    """Return ``(contents, new_contents, spans)`` for setting the version in
+    pyproject.toml, or ``None`` if there is no version line."""
+    # Read file as text to preserve formatting
+    with open(filepath, "r", encoding="utf-8") as f:
+        contents = f.read()
+
+    # Replace only the version value, preserving quotes and formatting
+    # Matches: version = "1.2.3" or version="1.2.3" or version = '1.2.3', etc.
+    # with optional whitespace
+    if "version" not in contents:
+        return None
+    new_contents, spans = _replace_version(toml_pattern, contents, new_version, count=1)
+    if not spans:
+        return None
+    return contents, new_contents, spans
+
+
+def _diff_version_in_toml(new_version, filepath="pyproject.toml"):
+    """Return the unified diff update_version_in_toml would apply, or ``None``."""
+    replacement = _read_toml_replacement(new_version, filepath)
+    if replacement is None:
+        return None
+    contents, _, spans = replacement
+    return _diff_version(filepath, contents, spans, new_version)
+
+
 def update_version_in_toml(new_version, filepath="pyproject.toml"):
     """Update version in pyproject.toml [project].version field."""
     if not os.path.exists(filepath):
         return False
     try:
-        # Read file as text to preserve formatting
-        with open(filepath, "r", encoding="utf-8") as f:
-            contents = f.read()
-
-        # Pattern to match version line in [project] section
-        # Matches: version = "1.2.3" or version="1.2.3" or version = '1.2.3', etc.
-        # with optional whitespace
-        version_pattern = re.compile(
-            r'^(\s*version\s*=\s*["\'])(.+?)(["\']\s*)$', re.MULTILINE
-        )
-
-        # Find the version line
-        match = version_pattern.search(contents)
-        if not match:
+        replacement = _read_toml_replacement(new_version, filepath)
+        if replacement is None:
             return False
 
-        # Replace only the version value, preserving quotes and formatting
-        new_contents = version_pattern.sub(
-            r"\g<1>{}\g<3>".format(new_version), contents, count=1
-        )
-
         # Write back the file
         with open(filepath, "w", encoding="utf-8") as f:
-            f.write(new_contents)
+            f.write(replacement[1])
 
         return True
     except IOError:
         return False
 
 
-@click.command()
+PACKAGE_FILES = ("setup.py", "pyproject.toml")
+DEFAULT_EXCLUDES = (
+    ".git",
+    ".hg",
+    ".svn",
+    ".tox",
+    ".nox",
+    ".venv",
+    "venv",
+    "node_modules",
+    "__pycache__",
+    "build",
+    "dist",
+    "*.egg-info",
+)
+
+
+def _compile_ignore_pattern(pattern):
+    """Translate a .gitignore glob into a regex for a ``/``-separated path.
+
+    Unlike with fnmatch, ``*``, ``?`` and ``[...]`` never match a ``/``, while
+    a leading ``**/``, a middle ``/**/`` and a trailing ``/**`` match any
+    number of directories.
+    """
+    regex = []
+    i = 0
+    if pattern.startswith("**/"):
+        regex.append("(?:.*/)?")
+        i = 3
+    while i < len(pattern):
+        if pattern.startswith("/**/", i):
+            regex.append("/(?:.*/)?")
+            i += 4
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex.append("/.*")
+            i += 3
+        elif pattern[i] == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            chars = pattern[i + 1 : end].replace("\\", "\\\\")
+            if chars[0] in "!^":
+                chars = "^" + chars[1:]
+            regex.append("(?!/)[{}]".format(chars))
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            regex.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(regex), re.DOTALL)
+
+
+def _parse_ignore_file(path):
+    """Parse a .gitignore file into ``(regex, negate, anchored)`` rules.
+
+    Only the subset of the syntax that matters for pruning directories is
+    supported. Since only directories are ever matched, a trailing slash is
+    simply dropped.
+    """
+    rules = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except (IOError, UnicodeDecodeError):
+        return rules
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        line = line.rstrip("/")
+        # A slash anywhere but the end anchors the pattern to its .gitignore
+        anchored = "/" in line
+        line = line.lstrip("/")
+        if line:
+            rules.append((_compile_ignore_pattern(line), negate, anchored))
+    return rules
+
+
+def _is_ignored(path, name, rules):
+    """Check a directory against the inherited ``(base, rule)`` pairs; as in
+    git, the last matching rule wins."""
+    ignored = False
+    for base, (regex, negate, anchored) in rules:
+        if anchored:
+            candidate = os.path.relpath(path, base).replace(os.sep, "/")
+        else:
+            candidate = name
+        if regex.fullmatch(candidate):
+            ignored = not negate
+    return ignored
+
+
+def _scan(path, rules, excludes):
+    """List a single directory.
+
+    Returns ``(is_package_root, subdirectories, rules)``, where ``rules`` has
+    been extended with the directory's own .gitignore, if any.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return False, [], rules
+
+    names = {entry.name for entry in entries}
+    if any(name in names for name in PACKAGE_FILES):
+        return True, [], rules
+
+    if ".gitignore" in names:
+        rules = rules + [
+            (path, rule)
+            for rule in _parse_ignore_file(os.path.join(path, ".gitignore"))
+        ]
+
+    subdirectories = [
+        entry.path
+        for entry in entries
+        if entry.is_dir(follow_symlinks=False)
+        and not any(fnmatch.fnmatchcase(entry.name, e) for e in excludes)
+        and not _is_ignored(entry.path, entry.name, rules)
+    ]
+    return False, subdirectories, rules
+
+
+def _walk(path, rules, excludes):
+    is_root, subdirectories, rules = _scan(path, rules, excludes)
+    if is_root:
+        # Don't descend any further, nested projects belong to this one
+        yield path
+        return
+    for subdirectory in subdirectories:
+        yield from _walk(subdirectory, rules, excludes)
+
+
+def find_packages(top=".", excludes=DEFAULT_EXCLUDES, workers=None):
+    """Lazily yield every package root (a directory containing a setup.py or
+    pyproject.toml) at or below ``top``.
+
+    Directories matching ``excludes`` or any .gitignore along the way are
+    pruned, as is everything below a package root. With ``workers``,
+    directories are scanned in parallel threads as soon as they are found, at
+    every level of the tree, but roots are still yielded in the same order as
+    a sequential walk.
+    """
+    if not workers or workers < 2:
+        yield from _walk(top, [], excludes)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    def scan(path, rules):
+        is_root, subdirectories, rules = _scan(path, rules, excludes)
+        return is_root, [
+            (subdirectory, executor.submit(scan, subdirectory, rules))
+            for subdirectory in subdirectories
+        ]
+
+    try:
+        stack = [(top, executor.submit(scan, top, []))]
+        while stack:
+            path, future = stack.pop()
+            is_root, children = future.result()
+            if is_root:
+                yield path
+            stack.extend(reversed(children))
+    finally:
+        # Scans still queued are pointless if the caller stopped early
+        executor.shutdown(cancel_futures=True)
+
+
+def _bump_version(
+    version_string, major, minor, patch, pre, local, reset, canonicalize, scheme
+):
+    version = scheme.parse(version_string)
+    version.bump(major, minor, patch, pre, local, reset)
+    version_string = str(version)
+    if canonicalize:
+        version_string = canonicalize_version(version_string)
+    return version_string
+
+
+def _resolve_options(
+    config, major, minor, patch, pre, local, reset, canonicalize, scheme
+):
+    """Fill in options that weren't given from ``config``, in the order
+    ``_bump_version`` takes them."""
+    major = major or config.get("major", coercer=bool, default=False)
+    minor = minor or config.get("minor", coercer=bool, default=False)
+    patch = patch or config.get("patch", coercer=bool, default=False)
+    reset = reset or config.get("reset", coercer=bool, default=False)
+    canonicalize = canonicalize or config.get(
+        "canonicalize", coercer=bool, default=False
+    )
+    scheme = get_scheme(scheme or config.get("scheme", default="semver"))
+    return major, minor, patch, pre, local, reset, canonicalize, scheme
+
+
+def _find_input(path, config):
+    """Return the file holding the version of the package at ``path``, or
+    ``None`` if only its pyproject.toml has one.
+
+    This is the auto-detection shared by main and bump_package: the configured
+    input file, else setup.py, falling back to pyproject.toml.
+    """
+    config_input = config.get("input", default=None)
+    input = os.path.normpath(os.path.join(path, config_input or "setup.py"))
+    if not config_input and not os.path.exists(input):
+        return None
+    return input
+
+
+def _plan_bump(input, contents, pyproject, options):
+    """Work out a bump without writing anything.
+
+    ``contents`` are those of ``input``, the file holding the version, or
+    ``None`` when ``pyproject`` is bumped on its own; ``options`` are as
+    returned by ``_resolve_options``. Returns ``(version_string, new_contents,
+    spans, update_pyproject)``, where the last tells whether ``pyproject`` has
+    a [project].version to update. Raises ``NoVersionFound``.
+    """
+    if input is None:
+        version_string = _bump_version(find_version_in_toml(pyproject), *options)
+        return version_string, None, None, True
+
+    version_string = _bump_version(find_version(contents), *options)
+    new_contents, spans = _replace_version(pattern, contents, version_string)
+    try:
+        find_version_in_toml(pyproject)
+    except NoVersionFound:
+        # pyproject.toml is missing or has no [project].version
+        return version_string, new_contents, spans, False
+    return version_string, new_contents, spans, True
+
+
+def find_package_version(path="."):
+    """Return the current version of the package at ``path``, without bumping
+    it. Raises ``NoVersionFound`` if there is none."""
+    input = _find_input(path, Config(path))
+    if input is None:
+        return find_version_in_toml(os.path.join(path, "pyproject.toml"))
+    with open(input, "rb") as f:
+        return find_version(f.read().decode("utf-8"))
+
+
+def bump_package(
+    path=".",
+    major=False,
+    minor=False,
+    patch=False,
+    reset=False,
+    pre=None,
+    local=None,
+    canonicalize=False,
+    scheme=None,
+):
+    """Bump the package at ``path`` the same way running ``bump`` from inside
+    it would, and return the new version.
+
+    The configured input file (or setup.py) is bumped, and pyproject.toml is
+    kept in sync with it. Without either, pyproject.toml is bumped on its own.
+    Raises ``NoVersionFound`` if there is no version to bump, and
+    ``ValueError`` for an unknown version scheme.
+    """
+    return _bump_package(
+        path, major, minor, patch, reset, pre, local, canonicalize, scheme
+    )[0]
+
+
+def _bump_package(path, major, minor, patch, reset, pre, local, canonicalize, scheme):
+    """``bump_package``, also returning the list of files it changed."""
+    plan = _plan_package(
+        path, major, minor, patch, reset, pre, local, canonicalize, scheme
+    )
+    return plan[0], _write_package(*plan)
+
+
+def _plan_package(path, major, minor, patch, reset, pre, local, canonicalize, scheme):
+    """Work out ``bump_package`` without writing anything.
+
+    Returns ``(version_string, input, new_contents, pyproject,
+    update_pyproject)``, to be passed on to ``_write_package``.
+    """
+    config = Config(path)
+    options = _resolve_options(
+        config, major, minor, patch, pre, local, reset, canonicalize, scheme
+    )
+
+    input = _find_input(path, config)
+    contents = None
+    if input is not None:
+        with open(input, "rb") as f:
+            contents = f.read().decode("utf-8")
+    pyproject = os.path.normpath(os.path.join(path, "pyproject.toml"))
+    version_string, new_contents, _, update_pyproject = _plan_bump(
+        input, contents, pyproject, options
+    )
+    return version_string, input, new_contents, pyproject, update_pyproject
+
+
+def _write_package(version_string, input, new_contents, pyproject, update_pyproject):
+    """Write out a ``_plan_package`` result, returning the changed files."""
+    changed = []
+    if input is not None:
+        with open(input, "wb") as f:
+            f.write(new_contents.encode())
+        changed.append(input)
+    if update_pyproject:
+        if update_version_in_toml(version_string, pyproject):
+            changed.append(pyproject)
+        elif input is None:
+            raise NoVersionFound
+    return changed
+
+
+async def bump_async(paths, concurrency=16, return_exceptions=False, **kwargs):
+    """Run ``bump_package`` for every path in ``paths`` without blocking the
+    event loop, and return the new versions in the same order.
+
+    The file I/O happens in a pool of ``concurrency`` threads, so at most that
+    many packages are being read or written at once. If a package fails (and
+    ``return_exceptions`` is false) or the returned coroutine is cancelled,
+    packages that haven't started yet are skipped, while those already in
+    progress are finished rather than left half-written, all before the error
+    propagates. Any other keyword arguments are passed on to ``bump_package``.
+    """
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def bump_one(path):
+        async with semaphore:
+            return await loop.run_in_executor(
+                executor, functools.partial(bump_package, path, **kwargs)
+            )
+
+    tasks = [asyncio.ensure_future(bump_one(path)) for path in paths]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        # Cancelled tasks stop waiting on jobs that are already running, so
+        # wait for those in a thread, to not block the loop, before returning
+        await loop.run_in_executor(None, executor.shutdown)
+
+
+def sync_version(source, targets=("pyproject.toml",)):
+    """Copy the version in ``source`` to each of the ``targets`` pyproject.toml
+    files that has a different one.
+
+    Returns the version if any target was updated, else ``None``, including
+    when ``source`` can't be read, e.g. because it is in the middle of a save.
+    """
+    try:
+        with open(source, "rb") as f:
+            version_string = find_version(f.read().decode("utf-8"))
+    except (IOError, UnicodeDecodeError, NoVersionFound):
+        return None
+
+    updated = False
+    for target in targets:
+        try:
+            if find_version_in_toml(target) != version_string:
+                updated = update_version_in_toml(version_string, target) or updated
+        except NoVersionFound:
+            # No [project].version to keep in sync
+            pass
+    return version_string if updated else None
+
+
+class _InotifyWatcher(object):
+    """Waits for changes to a file with Linux's inotify.
+
+    The parent directory is watched rather than the file itself, so that
+    editors which save by replacing the file are still noticed.
+    """
+
+    IN_CLOSE_WRITE = 0x08
+    IN_MOVED_TO = 0x80
+
+    def __init__(self, path):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is not available")
+
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.name = os.fsencode(os.path.basename(path))
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.fsencode(os.path.dirname(os.path.abspath(path)))
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+        if libc.inotify_add_watch(self.fd, directory, mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, "inotify_add_watch failed")
+
+    def wait(self, timeout=None):
+        """Block until the file changes or ``timeout`` seconds pass, and
+        return whether it changed."""
+        import select
+        import struct
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None
+            if deadline is not None:
+                remaining = max(0, deadline - time.monotonic())
+            readable, _, _ = select.select([self.fd], [], [], remaining)
+            if not readable:
+                return False
+
+            # Events for other files in the same directory are skipped
+            data = os.read(self.fd, 65536)
+            changed = False
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = struct.unpack_from("iIII", data, offset)
+                offset += 16
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                changed = changed or name == self.name
+            if changed:
+                return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _PollingWatcher(object):
+    """Waits for changes to a file by checking its modification time and size
+    every ``interval`` seconds, where inotify isn't available."""
+
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self.stat = self._stat()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def wait(self, timeout=None):
+        """Block until the file changes or ``timeout`` seconds pass, and
+        return whether it changed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            stat = self._stat()
+            if stat != self.stat:
+                self.stat = stat
+                return True
+            if deadline is None:
+                time.sleep(self.interval)
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+def watch_version(source, targets=("pyproject.toml",), debounce=0.2, interval=1.0):
+    """Keep ``targets`` in sync with the version in ``source`` as it changes,
+    yielding each version as it is propagated.
+
+    Only ``source`` is watched and re-read, with inotify where available and
+    by polling it every ``interval`` seconds otherwise. After a change, the
+    targets are updated once no further change has happened for ``debounce``
+    seconds, so a burst of writes results in a single update.
+    """
+    try:
+        watcher = _InotifyWatcher(source)
+    except (OSError, AttributeError):
+        watcher = _PollingWatcher(source, interval)
+    try:
+        while True:
+            version_string = sync_version(source, targets)
+            if version_string is not None:
+                yield version_string
+            watcher.wait()
+            while watcher.wait(debounce):
+                pass
+    finally:
+        watcher.close()
+
+
+class GitError(Exception):
+    pass
+
+
+def _git(args, cwd=".", input=None):
+    import subprocess
+
+    result = subprocess.run(
+        ["git"] + args, cwd=cwd, input=input, capture_output=True, check=False
+    )
+    if result.returncode != 0:
+        raise GitError(result.stderr.decode("utf-8", "replace").strip())
+    return result.stdout.decode("utf-8")
+
+
+def commit_and_tag(paths, message, tags=None, cwd="."):
+    """Commit ``paths`` to the git repository at ``cwd``, then create an
+    annotated tag on that commit for every name -> message in ``tags``.
+
+    However many files and tags there are, this runs the same handful of git
+    commands: the tag names are checked in one ``git update-ref`` transaction,
+    the files are staged in one ``git add``, committed once, and all tags are
+    written in a single ``git fast-import`` stream. Nothing is committed if any
+    tag name is invalid or already exists. Raises ``GitError`` if git fails.
+    """
+    tags = tags or {}
+    if tags:
+        # Verifying against an empty old value checks both that every name is
+        # a valid ref and that none of them exists yet, without changing refs
+        _git(
+            ["update-ref", "-z", "--stdin"],
+            cwd,
+            input=b"".join(
+                "verify refs/tags/{}\0\0".format(name).encode("utf-8") for name in tags
+            ),
+        )
+
+    _git(["add", "--"] + list(paths), cwd)
+    _git(["commit", "--quiet", "--message", message, "--"] + list(paths), cwd)
+    if not tags:
+        return
+
+    tagger = _git(["var", "GIT_COMMITTER_IDENT"], cwd).strip()
+    stream = []
+    for name, tag_message in tags.items():
+        tag_message = tag_message.encode("utf-8")
+        stream += [
+            "tag {}\nfrom HEAD\ntagger {}\n".format(name, tagger).encode("utf-8"),
+            "data {}\n".format(len(tag_message)).encode("utf-8"),
+            tag_message + b"\n",
+        ]
+    _git(["fast-import", "--quiet"], cwd, input=b"".join(stream))
+
+
+def _parse_version(version_string):
+    """Parse a version string once into ``(sort_key, is_prerelease)``.
+
+    PEP 440 versions are ordered properly, anything else sorts before them,
+    alphabetically.
+    """
+    try:
+        version = Version(version_string)
+    except InvalidVersion:
+        pass
+    else:
+        return (1, version), version.is_prerelease
+    try:
+        prerelease = SemVer.parse(version_string).pre is not None
+    except ValueError:
+        prerelease = False
+    return (0, version_string), prerelease
+
+
+def _tag_names(packages, tag_template):
+    """Render the tag of each of the ``(path, version)`` ``packages``, as a
+    ``{name: message}`` dict.
+
+    Exits with an error if two packages would get the same tag name, e.g. with
+    equal versions and a template without ``{name}``.
+    """
+    tags = {}
+    for path, version_string in packages:
+        name = tag_template.format(
+            version=version_string,
+            name=os.path.basename(os.path.abspath(path)),
+        )
+        tags.setdefault(name, []).append((path, version_string))
+    clashes = {name: tagged for name, tagged in tags.items() if len(tagged) > 1}
+    for name, tagged in clashes.items():
+        click.echo(
+            "Error: {} would all be tagged {}".format(
+                ", ".join(path for path, _ in tagged), name
+            ),
+            err=True,
+        )
+    if clashes:
+        sys.exit(1)
+    return {
+        name: "Bump version to {}".format(version_string)
+        for name, [(_, version_string)] in tags.items()
+    }
+
+
+def _commit_bump(paths, packages, tags):
+    """Commit ``paths``, the bump of the ``(path, version)`` ``packages``, and
+    create the ``{name: message}`` ``tags``, all in one go."""
+    if len(packages) == 1:
+        message = "Bump version to {}".format(packages[0][1])
+    else:
+        message = "Bump versions\n\n" + "".join(
+            "{}: {}\n".format(path, version_string) for path, version_string in packages
+        )
+    try:
+        commit_and_tag(paths, message, tags)
+    except GitError as e:
+        click.echo("Error: {}".format(e), err=True)
+        sys.exit(1)
+    click.echo("Committed {}".format(", ".join(paths)), err=True)
+    for name in tags:
+        click.echo("Tagged {}".format(name), err=True)
+
+
+def _bump_all(options, commit, tag, tag_template):
+    """Bump every package below the current directory, each according to its
+    own configuration, then commit and tag them all at once.
+
+    Every bump is worked out before anything is written, so that clashing tag
+    names leave the tree untouched.
+    """
+    plans = []
+    for path in find_packages("."):
+        path = os.path.normpath(path)
+        try:
+            plans.append((path, _plan_package(path, *options)))
+        except (NoVersionFound, ValueError) as e:
+            click.echo(
+                "Skipping {}: {}".format(path, str(e) or "no version found"), err=True
+            )
+
+    if not plans:
+        click.echo("No version found in any package.")
+        sys.exit(1)
+    packages = [(path, plan[0]) for path, plan in plans]
+    tags = _tag_names(packages, tag_template) if tag else {}
+
+    changed = []
+    for path, plan in plans:
+        changed += _write_package(*plan)
+        click.echo("{}  {}".format(path, plan[0]))
+    if commit:
+        _commit_bump(changed, packages, tags)
+
+
+class _BumpCommand(click.Command):
+    """The ``bump`` command, which hands off to a subcommand such as
+    ``bump list`` when one is given as the first argument."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands = {}
+
+    def command(self, name, **kwargs):
+        def decorator(f):
+            command = click.command(name, **kwargs)(f)
+            self.commands[name] = command
+            return command
+
+        return decorator
+
+    def main(self, args=None, prog_name=None, **kwargs):
+        args = sys.argv[1:] if args is None else list(args)
+        if args and args[0] in self.commands:
+            prog_name = "{} {}".format(
+                prog_name or os.path.basename(sys.argv[0]), args[0]
+            )
+            return self.commands[args[0]].main(args[1:], prog_name, **kwargs)
+        return super().main(args, prog_name, **kwargs)
+
+    def format_epilog(self, ctx, formatter):
+        with formatter.section("Commands"):
+            formatter.write_dl(
+                [
+                    (name, command.get_short_help_str())
+                    for name, command in self.commands.items()
+                ]
+            )
+        super().format_epilog(ctx, formatter)
+
+
+@click.command(cls=_BumpCommand)
 @click.option(
     "--major",
     "-M",
@@ -204,102 +1130,238 @@ def update_version_in_toml(new_version, filepath="pyproject.toml"):
 @click.option(
     "--canonicalize", flag_value=True, default=None, help="Canonicalize the new version"
 )
+@click.option("--scheme", help="Set the version scheme, e.g. semver or calver")
+@click.option(
+    "--commit",
+    flag_value=True,
+    default=None,
+    help="Commit the changed files to git",
+)
+@click.option(
+    "--tag",
+    flag_value=True,
+    default=None,
+    help="Also create an annotated git tag, implies --commit",
+)
+@click.option(
+    "--tag-template",
+    help="Set the tag name template. Ex.: v{version} or {name}-{version}",
+)
+@click.option(
+    "--all",
+    "all_packages",
+    flag_value=True,
+    default=None,
+    help="Bump every package found below the current directory",
+)
+@click.option(
+    "--watch",
+    flag_value=True,
+    default=None,
+    help="Keep pyproject.toml in sync with the input file as it changes",
+)
+@click.option(
+    "--dry-run",
+    flag_value=True,
+    default=None,
+    help="Print a diff of the changes instead of writing them",
+)
 @click.argument("input", type=click.File("rb"), default=None, required=False)
 @click.argument("output", type=click.File("wb"), default=None, required=False)
-def main(input, output, major, minor, patch, reset, pre, local, canonicalize):
+def main(
+    input,
+    output,
+    major,
+    minor,
+    patch,
+    reset,
+    pre,
+    local,
+    canonicalize,
+    scheme,
+    commit,
+    tag,
+    tag_template,
+    all_packages,
+    watch,
+    dry_run,
+):
     config = Config()
 
-    major = major or config.get("major", coercer=bool, default=False)
-    minor = minor or config.get("minor", coercer=bool, default=False)
-    patch = patch or config.get("patch", coercer=bool, default=False)
-    reset = reset or config.get("reset", coercer=bool, default=False)
-    canonicalize = canonicalize or config.get(
-        "canonicalize", coercer=bool, default=False
-    )
+    try:
+        options = _resolve_options(
+            config, major, minor, patch, pre, local, reset, canonicalize, scheme
+        )
+    except ValueError as e:
+        click.echo("Error: {}".format(e), err=True)
+        sys.exit(1)
+    tag = tag or config.get("tag", coercer=bool, default=False)
+    commit = commit or tag or config.get("commit", coercer=bool, default=False)
+    tag_template = tag_template or config.get("tag_template", default="v{version}")
+
+    if all_packages:
+        if input is not None or watch or dry_run:
+            click.echo("--all can't be combined with INPUT, --watch or --dry-run.")
+            sys.exit(1)
+        _bump_all(
+            (major, minor, patch, reset, pre, local, canonicalize, scheme),
+            commit,
+            tag,
+            tag_template,
+        )
+        return
 
-    # Determine which file to use
-    using_toml_only = False
+    # Determine which file to use, without an explicit input provided detect
+    # it automatically: prefer setup.py, fall back to pyproject.toml
     if input is None:
-        # No explicit input provided, detect automatically
-        config_input = config.get("input", default=None)
-        if config_input:
-            # Config specifies an input file
+        input_name = _find_input(".", config)
+        if input_name is not None:
             try:
-                input = click.File("rb")(config_input)
+                input = click.File("rb")(input_name)
             except IOError:
-                click.echo("Could not open file: {}".format(config_input))
+                click.echo("Could not open file: {}".format(input_name))
                 sys.exit(1)
-        else:
-            # Auto-detect: prefer setup.py, fall back to pyproject.toml
-            if os.path.exists("setup.py"):
-                try:
-                    input = click.File("rb")("setup.py")
-                except IOError:
-                    click.echo("Could not open setup.py")
-                    sys.exit(1)
-            else:
-                # No setup.py, try pyproject.toml
-                try:
-                    find_version_in_toml("pyproject.toml")
-                    using_toml_only = True
-                except NoVersionFound:
-                    click.echo(
-                        "No version found. Neither setup.py nor pyproject.toml with [project].version found."
-                    )
-                    sys.exit(1)
-
-    # Handle pyproject.toml as primary file
-    if using_toml_only:
-        try:
-            version_string = find_version_in_toml("pyproject.toml")
-        except NoVersionFound:
-            click.echo("No version found in pyproject.toml [project].version field.")
-            sys.exit(1)
 
-        version = SemVer.parse(version_string)
-        version.bump(major, minor, patch, pre, local, reset)
-        version_string = str(version)
-        if canonicalize:
-            version_string = canonicalize_version(version_string)
-
-        if update_version_in_toml(version_string, "pyproject.toml"):
-            click.echo(version_string)
-        else:
-            click.echo("Error: Could not update pyproject.toml", err=True)
+    if watch:
+        if dry_run:
+            click.echo("--watch can't be combined with --dry-run.")
+            sys.exit(1)
+        if input is None:
+            click.echo("Nothing to watch: pyproject.toml is the only version file.")
             sys.exit(1)
+        input.close()
+        click.echo("Watching {} for version changes".format(input.name), err=True)
+        try:
+            for version_string in watch_version(input.name):
+                click.echo(version_string)
+        except KeyboardInterrupt:
+            pass
         return
 
-    # Handle setup.py (or other Python file) as primary file
-    output = output or click.File("wb")(input.name)
-    contents = input.read().decode("utf-8")
+    contents = input.read().decode("utf-8") if input else None
     try:
-        version_string = find_version(contents)
+        version_string, new, spans, update_pyproject = _plan_bump(
+            input.name if input else None, contents, "pyproject.toml", options
+        )
     except NoVersionFound:
-        click.echo("No version found in ./{}.".format(input.name))
+        if input is None:
+            click.echo(
+                "No version found. Neither setup.py nor pyproject.toml with [project].version found."
+            )
+        else:
+            click.echo("No version found in ./{}.".format(input.name))
         sys.exit(1)
 
-    version = SemVer.parse(version_string)
-    version.bump(major, minor, patch, pre, local, reset)
-    version_string = str(version)
-    if canonicalize:
-        version_string = canonicalize_version(version_string)
-    new = pattern.sub(r"\g<1>{}\g<3>".format(version_string), contents)
-    output.write(new.encode())
+    if dry_run:
+        # Never open anything for writing, just show what would change
+        if input is not None:
+            click.echo(
+                _diff_version(input.name, contents, spans, version_string), nl=False
+            )
+        if update_pyproject:
+            click.echo(_diff_version_in_toml(version_string), nl=False)
+        return
 
-    # Also bump pyproject.toml if it exists
-    if os.path.exists("pyproject.toml"):
-        try:
-            find_version_in_toml("pyproject.toml")
-            if update_version_in_toml(version_string, "pyproject.toml"):
+    changed = []
+    if input is not None:
+        output = output or click.File("wb")(input.name)
+        output.write(new.encode())
+        output.flush()
+        changed.append(output.name)
+
+    # Also bump pyproject.toml, or on its own if it's the only version file
+    if update_pyproject:
+        if update_version_in_toml(version_string, "pyproject.toml"):
+            changed.append("pyproject.toml")
+            if input is not None:
                 click.echo("Updated pyproject.toml", err=True)
-            else:
-                click.echo("Warning: Could not update pyproject.toml", err=True)
-        except NoVersionFound:
-            # pyproject.toml exists but has no [project].version, continue normally
-            pass
+        elif input is None:
+            click.echo("Error: Could not update pyproject.toml", err=True)
+            sys.exit(1)
+        else:
+            click.echo("Warning: Could not update pyproject.toml", err=True)
 
+    if commit:
+        packages = [(".", version_string)]
+        tags = _tag_names(packages, tag_template) if tag else {}
+        _commit_bump(changed, packages, tags)
     click.echo(version_string)
 
 
+@main.command("list")
+@click.argument(
+    "top", type=click.Path(exists=True, file_okay=False), default=".", required=False
+)
+@click.option(
+    "--pre/--final",
+    "prerelease",
+    default=None,
+    help="Only list packages on a pre-release / final version",
+)
+@click.option(
+    "--sort",
+    type=click.Choice(["path", "version"]),
+    default="path",
+    help="Sort packages by path or by version",
+)
+@click.option("--reverse", flag_value=True, default=False, help="Reverse the order")
+@click.option(
+    "--json", "as_json", flag_value=True, default=False, help="Print JSON lines"
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=16,
+    help="Number of packages to scan at once",
+)
+def list_versions(top, prerelease, sort, reverse, as_json, workers):
+    """List the version of every package under TOP."""
+    import json
+    from concurrent.futures import ThreadPoolExecutor
+
+    def query(path):
+        try:
+            version_string = find_package_version(path)
+        except (
+            NoVersionFound,
+            IOError,
+            UnicodeDecodeError,
+            configparser.Error,
+            toml.TomlDecodeError,
+        ):
+            # Skip packages without a readable version or config
+            return None
+        key, is_prerelease = _parse_version(version_string)
+        return {
+            "path": os.path.relpath(path, top),
+            "version": version_string,
+            "prerelease": is_prerelease,
+            "key": key,
+        }
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        packages = [
+            package
+            for package in executor.map(query, find_packages(top, workers=workers))
+            if package is not None
+            and (prerelease is None or package["prerelease"] == prerelease)
+        ]
+
+    if sort == "version":
+        packages.sort(key=lambda package: package["key"], reverse=reverse)
+    elif reverse:
+        packages.reverse()
+
+    width = max((len(package["path"]) for package in packages), default=0)
+    for package in packages:
+        del package["key"]
+        if as_json:
+            click.echo(json.dumps(package))
+        else:
+            click.echo(
+                "{}  {}".format(package["path"].ljust(width), package["version"])
+            )
+
+
 if __name__ == "__main__":
     main()
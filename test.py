@@ -1,17 +1,39 @@
+import asyncio
+import datetime
+import importlib.metadata
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
 from pathlib import Path
 
 import pytest
 import toml
 from click.testing import CliRunner
 
+import bump
+
 from bump import (
+    CalVer,
     Config,
+    GitError,
     NoVersionFound,
     SemVer,
+    ZeroPaddedCalVer,
+    bump_async,
+    bump_package,
+    commit_and_tag,
+    find_packages,
     find_version,
     find_version_in_toml,
+    get_scheme,
     main,
+    sync_version,
     update_version_in_toml,
+    watch_version,
 )
 
 
@@ -136,6 +158,60 @@ def test_find_version(line, expected):
     assert find_version(line) == expected
 
 
+# Inputs that trigger superlinear behavior in naive version patterns: lazy
+# ``.+?`` scans to the end of the line for every unterminated quote, and a
+# multiline ``^\s*`` rescans all following blank lines from every line start.
+# Each builds an input of size proportional to ``n``.
+PATHOLOGICAL_INPUTS = {
+    "blank_lines": lambda n: "\n".join([" " * 10] * n),
+    "unterminated_quote": lambda n: 'version="' + "a" * (20 * n),
+    "many_unterminated_quotes": lambda n: 'version="a' * n,
+    "many_assignments": lambda n: "version=" * n,
+    "many_dunder_assignments": lambda n: "__version__ = '" * n,
+    "long_line": lambda n: "x" * (20 * n),
+    "mixed_quotes": lambda n: "version = \"1'" * n,
+}
+
+
+def time_matching(contents):
+    """Best of a few timings of both version patterns over ``contents``."""
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        try:
+            find_version(contents)
+        except NoVersionFound:
+            pass
+        bump.toml_pattern.subn("2.0.0", contents, count=1)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@pytest.mark.parametrize(
+    "build", PATHOLOGICAL_INPUTS.values(), ids=PATHOLOGICAL_INPUTS.keys()
+)
+def test_version_patterns_are_linear(build):
+    small = time_matching(build(10_000))
+    large = time_matching(build(40_000))
+    # Linear scanning takes about 4x as long for 4x the input, quadratic
+    # scanning about 16x; the constant absorbs noise on tiny timings
+    assert large < 8 * small + 0.005
+
+
+def test_find_version_fuzz():
+    tokens = ["version", "__", "=", " ", '"', "'", "\n", "1.2.3", "x"]
+    rng = random.Random(0)
+    for _ in range(2000):
+        contents = "".join(rng.choices(tokens, k=rng.randint(0, 40)))
+        try:
+            version = find_version(contents)
+        except NoVersionFound:
+            continue
+        assert version
+        assert not set(version) & {'"', "'", "\n"}
+        assert version in contents
+
+
 def test_config_toml(tmp_path, monkeypatch):
     config = """
     [tool.bump]
@@ -528,3 +604,724 @@ description = "Test package"
     # Verify pyproject.toml was updated
     pyproject_data = toml.load(pyproject_file)
     assert pyproject_data["project"]["version"] == "2.0.0"
+
+
+def test_find_packages(tmp_path):
+    for directory in [
+        "a",
+        "a/nested",
+        "b/c",
+        "d",
+        "node_modules/e",
+        "ignored/f",
+        "docs/_build/g",
+    ]:
+        (tmp_path / directory).mkdir(parents=True)
+    (tmp_path / "a" / "setup.py").write_text("")
+    (tmp_path / "a" / "nested" / "pyproject.toml").write_text("")
+    (tmp_path / "b" / "c" / "pyproject.toml").write_text("")
+    (tmp_path / "d" / "README.rst").write_text("")
+    (tmp_path / "node_modules" / "e" / "setup.py").write_text("")
+    (tmp_path / "ignored" / "f" / "setup.py").write_text("")
+    (tmp_path / "docs" / "_build" / "g" / "setup.py").write_text("")
+    (tmp_path / ".gitignore").write_text("# comment\n/ignored/\n")
+    (tmp_path / "docs" / ".gitignore").write_text("_build\n")
+
+    expected = [str(tmp_path / "a"), str(tmp_path / "b" / "c")]
+    assert list(find_packages(str(tmp_path))) == expected
+    assert list(find_packages(str(tmp_path), workers=4)) == expected
+
+
+def test_find_packages_negated_ignore(tmp_path):
+    for directory in ["keep", "drop"]:
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / "setup.py").write_text("")
+    (tmp_path / ".gitignore").write_text("*\n!keep\n")
+
+    assert list(find_packages(str(tmp_path))) == [str(tmp_path / "keep")]
+
+
+@pytest.mark.parametrize(
+    "ignore, directory, ignored",
+    [
+        ("**/gen", "gen", True),
+        ("**/gen", "src/gen", True),
+        ("a/**/b", "a/b", True),
+        ("a/**/b", "a/x/y/b", True),
+        ("a/**/b", "x/a/b", False),
+        ("src/**", "src/x", True),
+        ("src/*/gen", "src/a/gen", True),
+        ("src/*/gen", "src/a/b/gen", False),
+        ("src/?", "src/a", True),
+        ("src/[!a]", "src/a", False),
+    ],
+)
+def test_find_packages_gitignore_syntax(tmp_path, ignore, directory, ignored):
+    (tmp_path / directory).mkdir(parents=True)
+    (tmp_path / directory / "setup.py").write_text("")
+    (tmp_path / ".gitignore").write_text(ignore + "\n")
+
+    expected = [] if ignored else [str(tmp_path / directory)]
+    assert list(find_packages(str(tmp_path))) == expected
+
+
+def test_find_packages_parallel_below_wrapper(tmp_path, monkeypatch):
+    for name in ["a", "b"]:
+        (tmp_path / "packages" / name).mkdir(parents=True)
+        (tmp_path / "packages" / name / "setup.py").write_text("")
+    # Both packages are only scanned once the wrapper directory has been, and
+    # the barrier only lets them through if they are scanned concurrently
+    barrier = threading.Barrier(2, timeout=5)
+    scan = bump._scan
+
+    def concurrent_scan(path, rules, excludes):
+        if os.path.dirname(path) == str(tmp_path / "packages"):
+            barrier.wait()
+        return scan(path, rules, excludes)
+
+    monkeypatch.setattr(bump, "_scan", concurrent_scan)
+
+    assert list(find_packages(str(tmp_path), workers=4)) == [
+        str(tmp_path / "packages" / "a"),
+        str(tmp_path / "packages" / "b"),
+    ]
+
+
+def test_find_packages_top_is_package(tmp_path):
+    (tmp_path / "pyproject.toml").write_text("")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "setup.py").write_text("")
+
+    assert list(find_packages(str(tmp_path))) == [str(tmp_path)]
+    assert list(find_packages(str(tmp_path), workers=2)) == [str(tmp_path)]
+
+
+def test_bump_package(tmp_path):
+    (tmp_path / "setup.py").write_text("setup(version='1.0.0')")
+    (tmp_path / "pyproject.toml").write_text('[project]\nversion = "1.0.0"\n')
+    (tmp_path / ".bump").write_text("[bump]\nminor = true\n")
+
+    assert bump_package(str(tmp_path)) == "1.1.0"
+    assert (tmp_path / "setup.py").read_text() == "setup(version='1.1.0')"
+    assert find_version_in_toml(str(tmp_path / "pyproject.toml")) == "1.1.0"
+
+
+def test_bump_package_only_pyproject_toml(tmp_path):
+    (tmp_path / "pyproject.toml").write_text('[project]\nversion = "1.2.3"\n')
+
+    assert bump_package(str(tmp_path), major=True, reset=True) == "2.0.0"
+    assert find_version_in_toml(str(tmp_path / "pyproject.toml")) == "2.0.0"
+
+
+@pytest.mark.parametrize(
+    "files",
+    [
+        {"setup.py": "setup(version='1.0.0')"},
+        {"pyproject.toml": '[project]\nversion = "1.0.0"\n'},
+        {
+            "setup.py": "setup(version='1.0.0')",
+            "pyproject.toml": '[project]\nversion = "1.0.0"\n',
+        },
+        {
+            "src/version.py": '__version__ = "1.0.0"',
+            "pyproject.toml": '[project]\nversion = "1.0.0"\n'
+            '[tool.bump]\ninput = "src/version.py"\nminor = true\n',
+        },
+    ],
+)
+def test_bump_package_matches_cli(tmp_path, monkeypatch, files):
+    for root in ["cli", "package"]:
+        for name, contents in files.items():
+            (tmp_path / root / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / root / name).write_text(contents)
+
+    version = bump_package(str(tmp_path / "package"))
+    monkeypatch.chdir(tmp_path / "cli")
+    result = CliRunner().invoke(main, args=[])
+    assert result.exit_code == 0
+    assert result.output.splitlines()[-1] == version
+
+    for name in files:
+        assert (tmp_path / "cli" / name).read_text() == (
+            tmp_path / "package" / name
+        ).read_text()
+
+
+def test_bump_package_no_version(tmp_path):
+    with pytest.raises(NoVersionFound):
+        bump_package(str(tmp_path))
+
+
+def test_bump_async(tmp_path):
+    paths = []
+    for i in range(10):
+        path = tmp_path / str(i)
+        path.mkdir()
+        (path / "pyproject.toml").write_text(f'[project]\nversion = "{i}.0.0"\n')
+        paths.append(str(path))
+
+    versions = asyncio.run(bump_async(paths, concurrency=3, minor=True))
+    assert versions == [f"{i}.1.0" for i in range(10)]
+
+
+def test_bump_async_failure_stops_remaining(tmp_path, monkeypatch):
+    original_bump_package = bump.bump_package
+
+    def slow_bump_package(path, **kwargs):
+        time.sleep(0.05)
+        return original_bump_package(path, **kwargs)
+
+    monkeypatch.setattr(bump, "bump_package", slow_bump_package)
+
+    paths = []
+    for i in range(6):
+        path = tmp_path / str(i)
+        path.mkdir()
+        if i:
+            (path / "pyproject.toml").write_text('[project]\nversion = "1.0.0"\n')
+        paths.append(path)
+
+    with pytest.raises(NoVersionFound):
+        asyncio.run(bump_async([str(path) for path in paths], concurrency=1))
+
+    # Nothing is written anymore once bump_async has raised
+    versions = [
+        find_version_in_toml(str(path / "pyproject.toml")) for path in paths[1:]
+    ]
+    time.sleep(0.3)
+    assert [
+        find_version_in_toml(str(path / "pyproject.toml")) for path in paths[1:]
+    ] == versions
+    assert versions[1:] == ["1.0.0"] * 4
+
+
+def test_bump_async_return_exceptions(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "pyproject.toml").write_text('[project]\nversion = "1.0.0"\n')
+    (tmp_path / "b").mkdir()
+
+    paths = [str(tmp_path / "a"), str(tmp_path / "b")]
+    version, error = asyncio.run(bump_async(paths, return_exceptions=True))
+    assert version == "1.0.1"
+    assert isinstance(error, NoVersionFound)
+
+
+def test_cli_dry_run(tmp_path, monkeypatch):
+    setup_py = (
+        "from setuptools import setup\n"
+        + "\n" * 5
+        + ("setup(\n    name='test-package',\n    version='1.0.0',\n)\n")
+    )
+    pyproject = '[project]\nname = "test-package"\nversion = "1.0.0"'
+    setup_file = tmp_path / "setup.py"
+    setup_file.write_text(setup_py)
+    pyproject_file = tmp_path / "pyproject.toml"
+    pyproject_file.write_text(pyproject)
+
+    monkeypatch.chdir(tmp_path)
+
+    runner = CliRunner()
+    result = runner.invoke(main, args=["--dry-run"])
+    assert result.exit_code == 0
+    assert result.output == (
+        "--- a/setup.py\n"
+        "+++ b/setup.py\n"
+        "@@ -6,5 +6,5 @@\n"
+        " \n"
+        " setup(\n"
+        "     name='test-package',\n"
+        "-    version='1.0.0',\n"
+        "+    version='1.0.1',\n"
+        " )\n"
+        "--- a/pyproject.toml\n"
+        "+++ b/pyproject.toml\n"
+        "@@ -1,3 +1,3 @@\n"
+        " [project]\n"
+        ' name = "test-package"\n'
+        '-version = "1.0.0"\n'
+        "\\ No newline at end of file\n"
+        '+version = "1.0.1"\n'
+        "\\ No newline at end of file\n"
+    )
+
+    # Nothing was written
+    assert setup_file.read_text() == setup_py
+    assert pyproject_file.read_text() == pyproject
+
+
+def test_cli_dry_run_only_pyproject_toml(tmp_path, monkeypatch):
+    pyproject = '[project]\nversion = "1.0.0"\nname = "test-package"\n'
+    pyproject_file = tmp_path / "pyproject.toml"
+    pyproject_file.write_text(pyproject)
+
+    monkeypatch.chdir(tmp_path)
+
+    runner = CliRunner()
+    result = runner.invoke(main, args=["--dry-run", "--minor"])
+    assert result.exit_code == 0
+    assert result.output == (
+        "--- a/pyproject.toml\n"
+        "+++ b/pyproject.toml\n"
+        "@@ -1,3 +1,3 @@\n"
+        " [project]\n"
+        '-version = "1.0.0"\n'
+        '+version = "1.1.0"\n'
+        ' name = "test-package"\n'
+    )
+    assert pyproject_file.read_text() == pyproject
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    versions = {
+        "a": "1.10.0",
+        "b": "1.2.0",
+        "c": "2.0.0-rc1",
+        "d": "0.9.0",
+    }
+    for name, version in versions.items():
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "pyproject.toml").write_text(
+            f'[project]\nname = "{name}"\nversion = "{version}"\n'
+        )
+    (tmp_path / "d" / "pyproject.toml").unlink()
+    (tmp_path / "d" / "setup.py").write_text("setup(version='0.9.0')")
+    (tmp_path / "e").mkdir()
+    (tmp_path / "e" / "pyproject.toml").write_text("[build-system]\n")
+    return tmp_path
+
+
+def test_cli_list(workspace):
+    runner = CliRunner()
+    result = runner.invoke(main, args=["list", str(workspace)])
+    assert result.exit_code == 0
+    assert result.output == "a  1.10.0\nb  1.2.0\nc  2.0.0-rc1\nd  0.9.0\n"
+
+
+def test_cli_list_skips_invalid_config(workspace):
+    (workspace / "b" / "setup.cfg").write_text("[bump]\nminor = true\nminor = false\n")
+    (workspace / "c" / "pyproject.toml").write_text("[project\n")
+
+    runner = CliRunner()
+    result = runner.invoke(main, args=["list", str(workspace)])
+    assert result.exit_code == 0
+    assert result.output == "a  1.10.0\nd  0.9.0\n"
+
+
+def test_cli_list_rejects_zero_workers(workspace):
+    runner = CliRunner()
+    result = runner.invoke(main, args=["list", str(workspace), "--workers", "0"])
+    assert result.exit_code == 2
+    assert "--workers" in result.output
+
+
+def test_cli_list_sort_by_version(workspace):
+    runner = CliRunner()
+    result = runner.invoke(
+        main, args=["list", str(workspace), "--sort", "version", "--reverse"]
+    )
+    assert result.exit_code == 0
+    assert result.output.split() == [
+        "c",
+        "2.0.0-rc1",
+        "a",
+        "1.10.0",
+        "b",
+        "1.2.0",
+        "d",
+        "0.9.0",
+    ]
+
+
+@pytest.mark.parametrize(
+    "flag,expected", [("--pre", ["c"]), ("--final", ["a", "b", "d"])]
+)
+def test_cli_list_filter_prerelease(workspace, flag, expected):
+    runner = CliRunner()
+    result = runner.invoke(main, args=["list", str(workspace), flag, "--json"])
+    assert result.exit_code == 0
+    packages = [json.loads(line) for line in result.output.splitlines()]
+    assert [package["path"] for package in packages] == expected
+    assert all(package["prerelease"] == (flag == "--pre") for package in packages)
+
+
+def test_cli_help_lists_commands():
+    runner = CliRunner()
+    result = runner.invoke(main, args=["--help"])
+    assert result.exit_code == 0
+    assert "list  List the version of every package under TOP." in result.output
+
+
+@pytest.mark.parametrize(
+    "version,expected",
+    [
+        ("2024.5", "2024.5.0"),
+        ("2024.5.3", "2024.5.3"),
+        ("2024.05.3", "2024.5.3"),
+        ("2024.5.3-pre", "2024.5.3-pre"),
+        ("2024.5.3+local", "2024.5.3+local"),
+        ("2024.5.3-pre+local", "2024.5.3-pre+local"),
+    ],
+)
+def test_calver_str(version, expected):
+    assert str(CalVer.parse(version)) == expected
+
+
+@pytest.mark.parametrize("version", ["2024", "2024.5.3.1", "2024.may.1"])
+def test_calver_parse_invalid(version):
+    with pytest.raises(ValueError):
+        CalVer.parse(version)
+
+
+@pytest.mark.parametrize(
+    "version,today,expected",
+    [
+        ("2024.5.3", datetime.date(2024, 5, 20), "2024.5.4"),
+        ("2024.5.3", datetime.date(2024, 6, 1), "2024.6.0"),
+        ("2024.05.3", datetime.date(2025, 1, 1), "2025.1.0"),
+        ("2023.12.7-pre", datetime.date(2024, 1, 2), "2024.1.0-pre"),
+        ("2026.11.0", datetime.date(2026, 10, 18), "2026.11.1"),
+        ("2027.1.2", datetime.date(2026, 10, 18), "2027.1.3"),
+    ],
+)
+def test_calver_bump(version, today, expected):
+    calver = CalVer.parse(version)
+    calver.bump(today=today)
+    assert str(calver) == expected
+
+
+@pytest.mark.parametrize(
+    "version,today,expected",
+    [
+        ("2024.5.3", datetime.date(2024, 5, 20), "2024.05.4"),
+        ("2024.09.3", datetime.date(2024, 10, 1), "2024.10.0"),
+        ("2024.12.3", datetime.date(2024, 12, 20), "2024.12.4"),
+        ("2024.12.3", datetime.date(2025, 1, 1), "2025.01.0"),
+    ],
+)
+def test_zero_padded_calver_bump(version, today, expected):
+    calver = ZeroPaddedCalVer.parse(version)
+    calver.bump(today=today)
+    assert str(calver) == expected
+
+
+def test_calver_bump_pre_only():
+    calver = CalVer.parse("2024.5.3")
+    calver.bump(pre="rc1", today=datetime.date(2024, 6, 1))
+    assert str(calver) == "2024.5.3-rc1"
+
+
+def test_get_scheme_builtin():
+    assert get_scheme("semver") is SemVer
+    assert get_scheme("calver") is CalVer
+    assert get_scheme("calver-padded") is ZeroPaddedCalVer
+
+
+def test_get_scheme_entry_point(monkeypatch):
+    def entry_points(group, name):
+        assert group == "bump.schemes"
+        return [
+            importlib.metadata.EntryPoint(
+                name=name, value="datetime:date", group="bump.schemes"
+            )
+        ]
+
+    monkeypatch.setattr(importlib.metadata, "entry_points", entry_points)
+    assert get_scheme("custom") is datetime.date
+
+
+def test_get_scheme_unknown():
+    with pytest.raises(ValueError, match="unknown version scheme: nosuchscheme"):
+        get_scheme("nosuchscheme")
+
+
+def test_cli_scheme_from_config(tmp_path, monkeypatch):
+    this_month = datetime.date.today()
+    pyproject = f"""
+[project]
+name = "test-package"
+version = "{this_month.year}.{this_month.month}.1"
+
+[tool.bump]
+scheme = "calver"
+    """
+    pyproject_file = tmp_path / "pyproject.toml"
+    pyproject_file.write_text(pyproject)
+
+    monkeypatch.chdir(tmp_path)
+
+    runner = CliRunner()
+    result = runner.invoke(main, args=[])
+    expected = f"{this_month.year}.{this_month.month}.2"
+    assert result.exit_code == 0
+    assert result.output == expected + "\n"
+    assert find_version_in_toml("pyproject.toml") == expected
+
+
+def test_cli_unknown_scheme(tmp_path, monkeypatch):
+    (tmp_path / "setup.py").write_text("setup(version='1.0.0')")
+    monkeypatch.chdir(tmp_path)
+
+    runner = CliRunner()
+    result = runner.invoke(main, args=["--scheme", "nosuchscheme"])
+    assert result.exit_code == 1
+    assert "unknown version scheme: nosuchscheme" in result.output
+    assert (tmp_path / "setup.py").read_text() == "setup(version='1.0.0')"
+
+
+def test_sync_version(tmp_path):
+    setup_file = tmp_path / "setup.py"
+    setup_file.write_text("setup(version='1.1.0')")
+    pyproject_file = tmp_path / "pyproject.toml"
+    pyproject_file.write_text('[project]\nversion = "1.0.0"\n')
+    targets = [str(pyproject_file)]
+
+    assert sync_version(str(setup_file), targets) == "1.1.0"
+    assert find_version_in_toml(str(pyproject_file)) == "1.1.0"
+
+    # Already in sync
+    assert sync_version(str(setup_file), targets) is None
+
+
+def test_sync_version_without_source_version(tmp_path):
+    setup_file = tmp_path / "setup.py"
+    setup_file.write_text("setup(")
+    pyproject_file = tmp_path / "pyproject.toml"
+    pyproject_file.write_text('[project]\nversion = "1.0.0"\n')
+
+    assert sync_version(str(setup_file), [str(pyproject_file)]) is None
+    assert find_version_in_toml(str(pyproject_file)) == "1.0.0"
+
+
+def next_with_timeout(iterator, timeout=5):
+    """``next(iterator)``, failing rather than hanging if it blocks."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(next(iterator)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert result, "timed out waiting for the next value"
+    return result[0]
+
+
+@pytest.mark.parametrize("inotify", [True, False])
+def test_watch_version(tmp_path, monkeypatch, inotify):
+    if not inotify:
+
+        def unavailable(path):
+            raise OSError("inotify is not available")
+
+        monkeypatch.setattr(bump, "_InotifyWatcher", unavailable)
+
+    setup_file = tmp_path / "setup.py"
+    setup_file.write_text("setup(version='1.0.0')")
+    pyproject_file = tmp_path / "pyproject.toml"
+    pyproject_file.write_text('[project]\nversion = "0.9.0"\n')
+
+    versions = watch_version(
+        str(setup_file), [str(pyproject_file)], debounce=0.05, interval=0.05
+    )
+    # Targets are synced when the watch starts
+    assert next_with_timeout(versions) == "1.0.0"
+    assert find_version_in_toml(str(pyproject_file)) == "1.0.0"
+
+    setup_file.write_text("setup(version='1.1.0')")
+    setup_file.write_text("setup(version='1.2.0')")
+    assert next_with_timeout(versions) == "1.2.0"
+    assert find_version_in_toml(str(pyproject_file)) == "1.2.0"
+    versions.close()
+
+
+def test_watch_version_falls_back_to_polling(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "platform", "win32")
+    setup_file = tmp_path / "setup.py"
+    setup_file.write_text("setup(version='1.0.0')")
+    pyproject_file = tmp_path / "pyproject.toml"
+    pyproject_file.write_text('[project]\nversion = "0.9.0"\n')
+
+    versions = watch_version(str(setup_file), [str(pyproject_file)], interval=0.05)
+    assert next_with_timeout(versions) == "1.0.0"
+    assert isinstance(versions.gi_frame.f_locals["watcher"], bump._PollingWatcher)
+    versions.close()
+
+
+def test_cli_watch_only_pyproject_toml(tmp_path, monkeypatch):
+    (tmp_path / "pyproject.toml").write_text('[project]\nversion = "1.0.0"\n')
+    monkeypatch.chdir(tmp_path)
+
+    runner = CliRunner()
+    result = runner.invoke(main, args=["--watch"])
+    assert result.exit_code == 1
+    assert "Nothing to watch" in result.output
+
+
+def test_cli_watch_rejects_dry_run(tmp_path, monkeypatch):
+    (tmp_path / "setup.py").write_text("setup(version='2.0.0')")
+    (tmp_path / "pyproject.toml").write_text('[project]\nversion = "1.0.0"\n')
+    monkeypatch.chdir(tmp_path)
+
+    runner = CliRunner()
+    result = runner.invoke(main, args=["--watch", "--dry-run"])
+    assert result.exit_code == 1
+    assert "--dry-run" in result.output
+    assert find_version_in_toml(str(tmp_path / "pyproject.toml")) == "1.0.0"
+
+
+@pytest.fixture
+def git_repo(tmp_path, monkeypatch):
+    for variable in ["AUTHOR", "COMMITTER"]:
+        monkeypatch.setenv(f"GIT_{variable}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{variable}_EMAIL", "test@example.com")
+
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], cwd=tmp_path, check=True, capture_output=True, text=True
+        ).stdout
+
+    git("init", "--quiet")
+    for name in ["a", "b"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "pyproject.toml").write_text(
+            '[project]\nversion = "1.0.0"\n'
+        )
+    git("add", ".")
+    git("commit", "--quiet", "--message", "Initial commit")
+    return git
+
+
+def test_commit_and_tag(tmp_path, git_repo):
+    versions = asyncio.run(bump_async([str(tmp_path / "a"), str(tmp_path / "b")]))
+    assert versions == ["1.0.1", "1.0.1"]
+
+    commit_and_tag(
+        ["a/pyproject.toml", "b/pyproject.toml"],
+        "Bump versions",
+        {"a-v1.0.1": "Release a 1.0.1", "b-v1.0.1": "Release b 1.0.1"},
+        cwd=str(tmp_path),
+    )
+
+    assert git_repo("log", "--format=%s").splitlines() == [
+        "Bump versions",
+        "Initial commit",
+    ]
+    assert git_repo("status", "--porcelain") == ""
+    head = git_repo("rev-parse", "HEAD")
+    for name in ["a", "b"]:
+        assert git_repo("cat-file", "-t", f"{name}-v1.0.1") == "tag\n"
+        assert git_repo("rev-parse", f"{name}-v1.0.1^{{commit}}") == head
+        assert git_repo(
+            "tag", "--list", "--format=%(contents)", f"{name}-v1.0.1"
+        ).startswith(f"Release {name} 1.0.1")
+
+
+def test_commit_and_tag_existing_tag(tmp_path, git_repo):
+    git_repo("tag", "v1.0.1")
+    (tmp_path / "a" / "pyproject.toml").write_text('[project]\nversion = "1.0.1"\n')
+
+    with pytest.raises(GitError, match="reference already exists"):
+        commit_and_tag(
+            ["a/pyproject.toml"], "Bump", {"v1.0.1": "Bump"}, cwd=str(tmp_path)
+        )
+    assert git_repo("log", "--format=%s").splitlines() == ["Initial commit"]
+
+
+def test_commit_and_tag_invalid_tag_name(tmp_path, git_repo):
+    (tmp_path / "a" / "pyproject.toml").write_text('[project]\nversion = "1.0.1"\n')
+
+    with pytest.raises(GitError, match="invalid ref format"):
+        commit_and_tag(
+            ["a/pyproject.toml"],
+            "Bump",
+            {"v1.0.1": "Bump", "rel 1.0.1": "Bump"},
+            cwd=str(tmp_path),
+        )
+    assert git_repo("log", "--format=%s").splitlines() == ["Initial commit"]
+    assert git_repo("tag", "--list") == ""
+
+
+def test_cli_commit_and_tag_all(tmp_path, git_repo, monkeypatch):
+    (tmp_path / "b" / ".bump").write_text("[bump]\nminor = true\n")
+    (tmp_path / "c").mkdir()
+    (tmp_path / "c" / "pyproject.toml").write_text("[build-system]\n")
+    monkeypatch.chdir(tmp_path)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main, args=["--all", "--tag", "--tag-template", "{name}-v{version}"]
+    )
+    assert result.exit_code == 0
+    assert "a  1.0.1\nb  1.1.0\n" in result.output
+    assert "Skipping c" in result.output
+
+    assert git_repo("log", "--format=%B", "-1") == (
+        "Bump versions\n\na: 1.0.1\nb: 1.1.0\n\n"
+    )
+    assert git_repo("rev-list", "--count", "HEAD") == "2\n"
+    assert git_repo("show", "--name-only", "--format=", "HEAD").split() == [
+        "a/pyproject.toml",
+        "b/pyproject.toml",
+    ]
+    assert git_repo("tag", "--list").split() == ["a-v1.0.1", "b-v1.1.0"]
+    head = git_repo("rev-parse", "HEAD")
+    assert git_repo("rev-parse", "a-v1.0.1^{commit}", "b-v1.1.0^{commit}") == head * 2
+
+
+@pytest.mark.parametrize(
+    "packages, args, tag",
+    [
+        (["a", "b"], [], "v1.0.1"),
+        (
+            ["libs/foo", "apps/foo"],
+            ["--tag-template", "{name}-v{version}"],
+            "foo-v1.0.1",
+        ),
+    ],
+)
+def test_cli_tag_all_name_clash(tmp_path, git_repo, monkeypatch, packages, args, tag):
+    for package in packages:
+        (tmp_path / package).mkdir(parents=True, exist_ok=True)
+        (tmp_path / package / "pyproject.toml").write_text(
+            '[project]\nversion = "1.0.0"\n'
+        )
+    git_repo("add", ".")
+    git_repo("commit", "--quiet", "--allow-empty", "--message", "Add packages")
+    monkeypatch.chdir(tmp_path)
+
+    runner = CliRunner()
+    result = runner.invoke(main, args=["--all", "--tag"] + args)
+    assert result.exit_code == 1
+    assert "{}, {} would all be tagged {}".format(*sorted(packages), tag) in (
+        result.output
+    )
+    assert git_repo("status", "--porcelain") == ""
+    assert git_repo("tag", "--list") == ""
+
+
+def test_cli_all_rejects_input(tmp_path, monkeypatch):
+    (tmp_path / "setup.py").write_text("setup(version='1.0.0')")
+    monkeypatch.chdir(tmp_path)
+
+    runner = CliRunner()
+    result = runner.invoke(main, args=["--all", "setup.py"])
+    assert result.exit_code == 1
+    assert (tmp_path / "setup.py").read_text() == "setup(version='1.0.0')"
+
+
+def test_cli_commit_and_tag(tmp_path, git_repo, monkeypatch):
+    (tmp_path / "a" / "setup.py").write_text("setup(version='1.0.0')")
+    (tmp_path / "a" / ".bump").write_text("[bump]\ntag_template = {name}-{version}\n")
+    git_repo("add", ".")
+    git_repo("commit", "--quiet", "--message", "Add setup.py")
+    monkeypatch.chdir(tmp_path / "a")
+
+    runner = CliRunner()
+    result = runner.invoke(main, args=["--tag"])
+    assert result.exit_code == 0
+    assert result.output.splitlines()[-1] == "1.0.1"
+
+    assert git_repo("log", "-1", "--format=%s") == "Bump version to 1.0.1\n"
+    assert git_repo("show", "--name-only", "--format=", "HEAD").split() == [
+        "a/pyproject.toml",
+        "a/setup.py",
+    ]
+    assert git_repo("status", "--porcelain") == ""
+    assert git_repo("tag", "--list") == "a-1.0.1\n"